@@ -1,11 +1,16 @@
 import asyncio
+import sys
 from . import server
 
 def main():
     """Entry point for the overseerr-mcp command.
-    Properly runs the async main function from server.py
+    Properly runs the async main function from server.py, on uvloop where available
     """
-    asyncio.run(server.main())
+    if sys.platform != "win32":
+        import uvloop
+        asyncio.run(server.main(), loop_factory=uvloop.new_event_loop)
+    else:
+        asyncio.run(server.main())
 
 # Optionally expose other important items at package level
 __all__ = ['main', 'server']
\ No newline at end of file
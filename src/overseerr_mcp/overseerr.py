@@ -1,16 +1,97 @@
-import requests
-from typing import Any, List, Dict, Optional
+import asyncio
+import time
+from datetime import datetime, timezone
+import httpx
+import orjson
+from typing import Any, List, Dict, Optional, Sequence
+
+# Responses worth retrying after a short backoff
+RETRY_STATUS_CODES = frozenset({429, 503})
+
+class OverseerrError(Exception):
+    """Raised when a call to the Overseerr API fails."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp such as '2020-09-12T10:00:27.000Z', assuming UTC when no offset is given."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _project(data: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Keep only the given keys of data, where 'key.sub' trims each item of a nested list or dict."""
+    projected = {}
+    nested = {}
+    for field in fields:
+        key, _, sub = field.partition(".")
+        if sub:
+            nested.setdefault(key, []).append(sub)
+        elif key in data:
+            projected[key] = data[key]
+
+    for key, subs in nested.items():
+        value = data.get(key)
+        if isinstance(value, list):
+            projected[key] = [_project(item, subs) for item in value if isinstance(item, dict)]
+        elif isinstance(value, dict):
+            projected[key] = _project(value, subs)
+
+    return projected
 
 class Overseerr:
     def __init__(
-            self, 
+            self,
             api_key: str,
             url: str,
-            timeout: tuple = (3, 30)
+            timeout: tuple = (3, 30),
+            cache_ttl: float = 3600,
+            season_cache_ttl: float = 86400,
+            requests_cache_ttl: float = 30,
+            cache_maxsize: int = 4096,
+            max_retries: int = 3
         ):
         self.api_key = api_key
         self.url = url
         self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.season_cache_ttl = season_cache_ttl
+        self.requests_cache_ttl = requests_cache_ttl
+        self.cache_maxsize = cache_maxsize
+        self.max_retries = max_retries
+
+        # A single long-lived client keeps connections alive between calls,
+        # so the detail lookups don't pay a new TCP/TLS handshake each time.
+        # Redirects are followed, e.g. a proxy sending http:// on to https://.
+        # HTTP/2 multiplexes concurrent lookups over one connection when the
+        # server negotiates it, and falls back to HTTP/1.1 otherwise. The
+        # transport also retries failed connection attempts.
+        self._client = httpx.AsyncClient(
+            base_url=self.url,
+            headers=self._get_headers(),
+            follow_redirects=True,
+            timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=30.0
+                )
+            )
+        )
+
+        # Caps the number of in-flight requests when callers fan out lookups
+        self._semaphore = asyncio.Semaphore(16)
+
+        # Memoized lookups: key -> (expires_at, task). Storing the task rather
+        # than the result lets concurrent callers share one request.
+        self._cache: Dict[tuple, tuple] = {}
+
+        # Last ETag and parsed body per request list page, for conditional GETs
+        self._etags: Dict[tuple, tuple] = {}
 
     def _get_headers(self) -> dict:
         headers = {
@@ -19,72 +100,190 @@ class Overseerr:
         }
         return headers
 
-    def _safe_call(self, call_fn):
+    async def _safe_call(self, call_fn):
         try:
-            return call_fn()
-        except requests.exceptions.HTTPError as e:
-            error_data = e.response.json() if e.response.content else {}
-            message = error_data.get('message', '<unknown>')
-            raise Exception(f"HTTP Error {e.response.status_code}: {message}")
-        except requests.RequestException as e:
-            raise Exception(f"Request failed: {str(e)}")
-
-    def get_status(self) -> Dict[str, Any]:
-        """Get the status of the Overseerr server."""
-        url = f"{self.url}/api/v1/status"
-        
-        def call_fn():
-            response = requests.get(url, headers=self._get_headers(), timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+            return await call_fn()
+        except httpx.RequestError as e:
+            raise OverseerrError(f"Request failed: {str(e)}")
 
-        return self._safe_call(call_fn)
+    def _check_response(self, response: httpx.Response) -> None:
+        # Anything but a 2xx is an error here; a 304 to a conditional GET is
+        # handled by the caller before getting this far
+        if response.is_success:
+            return
 
-    def get_movie_details(self, movie_id: int) -> Dict[str, Any]:
-        """Get movie details for a specific movie ID."""
-        url = f"{self.url}/api/v1/movie/{movie_id}"
-        
-        def call_fn():
-            response = requests.get(url, headers=self._get_headers(), timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+        # Error bodies are usually JSON, but a reverse proxy may answer with HTML
+        try:
+            body = orjson.loads(response.content)
+        except ValueError:
+            body = None
 
-        return self._safe_call(call_fn)
+        if isinstance(body, dict):
+            message = body.get('message', '<unknown>')
+        else:
+            message = response.text or '<unknown>'
+        raise OverseerrError(f"HTTP Error {response.status_code}: {message}", status_code=response.status_code)
 
-    def get_tv_details(self, tv_id: int) -> Dict[str, Any]:
-        """Get TV details for a specific TV ID."""
-        url = f"{self.url}/api/v1/tv/{tv_id}"
-        
-        def call_fn():
-            response = requests.get(url, headers=self._get_headers(), timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+    async def _get(
+            self,
+            url: str,
+            params: Optional[Dict[str, Any]] = None,
+            conditional: bool = False
+        ) -> Dict[str, Any]:
+        # With conditional set, send the last ETag seen for this URL and reuse
+        # the previous body on a 304 instead of downloading and decoding it again
+        key = (url, tuple(sorted(params.items())) if params else ())
+        cached = self._etags.get(key) if conditional else None
+        headers = {"If-None-Match": cached[0]} if cached else None
 
-        return self._safe_call(call_fn)
+        async def call_fn():
+            for attempt in range(self.max_retries + 1):
+                async with self._semaphore:
+                    response = await self._client.get(url, params=params, headers=headers)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    break
 
-    def get_season_details(self, tv_id: int, season_id: int) -> Dict[str, Any]:
-        """Get season details including episodes for a specific TV show and season."""
-        url = f"{self.url}/api/v1/tv/{tv_id}/season/{season_id}"
-        
-        def call_fn():
-            response = requests.get(url, headers=self._get_headers(), timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
+                # Back off (outside the semaphore) when Overseerr is throttling or overloaded,
+                # never waiting longer than the largest exponential backoff step
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+                await asyncio.sleep(min(delay, 2 ** self.max_retries))
+
+            if cached and response.status_code == 304:
+                return cached[1]
+            self._check_response(response)
+
+            try:
+                data = orjson.loads(response.content)
+            except orjson.JSONDecodeError as e:
+                raise OverseerrError(f"Invalid JSON response from {url}: {str(e)}", status_code=response.status_code)
+
+            etag = response.headers.get("ETag")
+            if conditional and etag:
+                self._etags.pop(key, None)
+                self._etags[key] = (etag, data)
+                if len(self._etags) > self.cache_maxsize:
+                    del self._etags[next(iter(self._etags))]
+
+            return data
+
+        return await self._safe_call(call_fn)
+
+    async def _get_projected(self, url: str, fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+        data = await self._get(url)
+        return _project(data, fields) if fields else data
 
-        return self._safe_call(call_fn)
+    async def _cached(self, key: tuple, ttl: float, fetch) -> Any:
+        now = time.monotonic()
+        entry = self._cache.pop(key, None)
+        if entry and entry[0] > now:
+            # Re-insert to keep the most recently used entries at the end
+            self._cache[key] = entry
+            return await asyncio.shield(entry[1])
 
-    def get_requests(self, params: Dict[str, Any] = {}) -> Dict[str, Any]:
+        task = asyncio.ensure_future(fetch())
+        self._cache[key] = (now + ttl, task)
+        if len(self._cache) > self.cache_maxsize:
+            del self._cache[next(iter(self._cache))]
+
+        def evict_failed(t):
+            # Don't keep failed lookups around, even if every caller has gone
+            if (t.cancelled() or t.exception() is not None) and self._cache.get(key, (None, None))[1] is t:
+                del self._cache[key]
+
+        task.add_done_callback(evict_failed)
+        return await asyncio.shield(task)
+
+    async def _get_cached(
+            self,
+            url: str,
+            fields: Optional[Sequence[str]] = None,
+            ttl: Optional[float] = None
+        ) -> Dict[str, Any]:
+        # Only the requested fields are cached, so large payloads (cast, crew,
+        # guest stars...) don't stay resident for the lifetime of the entry
+        key = (url, tuple(fields) if fields else None)
+        ttl = self.cache_ttl if ttl is None else ttl
+        return await self._cached(key, ttl, lambda: self._get_projected(url, fields))
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its pooled connections."""
+        await self._client.aclose()
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Get the status of the Overseerr server."""
+        url = "/api/v1/status"
+        return await self._get(url)
+
+    async def get_movie_details(self, movie_id: int, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Get movie details for a specific movie ID."""
+        url = f"/api/v1/movie/{movie_id}"
+        return await self._get_cached(url, fields)
+
+    async def get_tv_details(self, tv_id: int, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Get TV details for a specific TV ID."""
+        url = f"/api/v1/tv/{tv_id}"
+        return await self._get_cached(url, fields)
+
+    async def get_season_details(self, tv_id: int, season_id: int, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Get season details including episodes for a specific TV show and season."""
+        url = f"/api/v1/tv/{tv_id}/season/{season_id}"
+        return await self._get_cached(url, fields, ttl=self.season_cache_ttl)
+
+    async def get_requests(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get requests from the Overseerr API."""
-        url = f"{self.url}/api/v1/request"
-        
-        # Build query string
-        query_string = "&".join([f"{key}={value}" for key, value in params.items()])
-        if query_string:
-            url = f"{url}?{query_string}"
-        
-        def call_fn():
-            response = requests.get(url, headers=self._get_headers(), timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-
-        return self._safe_call(call_fn)
\ No newline at end of file
+        url = "/api/v1/request"
+        return await self._get(url, params=params, conditional=True)
+
+    async def get_all_requests(
+            self,
+            params: Optional[Dict[str, Any]] = None,
+            take: int = 20,
+            created_after: Optional[datetime] = None
+        ) -> List[Dict[str, Any]]:
+        """Get the results of every page of requests from the Overseerr API.
+
+        With created_after, pages are walked newest first and the walk stops at the
+        first page reaching older requests, so the results may include a few of them.
+        """
+        # Base params are built once; each page only adds its own skip. A single
+        # dict can't be mutated in place here since the pages are fetched concurrently.
+        # The "added" sort always applies, since fetch_since relies on that order.
+        params = {**(params or {}), "sort": "added", "take": take}
+
+        async def fetch():
+            # The first page tells how many pages there are, the rest are fetched at once
+            first_page = await self.get_requests({**params, "skip": 0})
+            total_pages = first_page.get("pageInfo", {}).get("pages", 1)
+            other_pages = await asyncio.gather(*[
+                self.get_requests({**params, "skip": page * take})
+                for page in range(1, total_pages)
+            ])
+
+            return [
+                result
+                for response in [first_page, *other_pages]
+                for result in response.get("results", [])
+            ]
+
+        async def fetch_since():
+            # Sorted by "added" the newest requests come first, so once a page
+            # ends before created_after no later page can match
+            results = []
+            page = 0
+            while True:
+                response = await self.get_requests({**params, "skip": page * take})
+                page_results = response.get("results", [])
+                results.extend(page_results)
+
+                page += 1
+                if not page_results or page >= response.get("pageInfo", {}).get("pages", 1):
+                    return results
+
+                created_at = page_results[-1].get("createdAt")
+                if created_at and parse_timestamp(created_at) < created_after:
+                    return results
+
+        # Cached briefly so back-to-back movie and TV lookups share one walk of the list
+        key = ("/api/v1/request", tuple(sorted(params.items())), created_after)
+        return await self._cached(key, self.requests_cache_ttl, fetch_since if created_after else fetch)
\ No newline at end of file
@@ -63,7 +63,7 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
         raise ValueError(f"Unknown tool: {name}")
 
     try:
-        return tool_handler.run_tool(arguments)
+        return await tool_handler.run_tool(arguments)
     except Exception as e:
         logger.error(str(e))
         raise RuntimeError(f"Caught Exception. Error: {str(e)}")
@@ -72,9 +72,12 @@ async def main():
     # Import here to avoid issues with event loops
     from mcp.server.stdio import stdio_server
 
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await tools.client.aclose()
@@ -5,8 +5,10 @@ from mcp.types import (
     ImageContent,
     EmbeddedResource,
 )
+import asyncio
 import json
 import os
+from datetime import datetime
 from . import overseerr
 
 # Constants for tool names
@@ -21,14 +23,43 @@ url = os.getenv("OVERSEERR_URL", "")
 if not api_key or not url:
     raise ValueError("OVERSEERR_API_KEY and OVERSEERR_URL environment variables are required")
 
-# Media status mapping
-MEDIA_STATUS_MAPPING = {
-    1: "UNKNOWN",
-    2: "PENDING", 
-    3: "PROCESSING",
-    4: "PARTIALLY_AVAILABLE",
-    5: "AVAILABLE"
-}
+# Shared client, so every tool call reuses the same connection pool
+client = overseerr.Overseerr(api_key=api_key, url=url)
+
+# Media status names, indexed by Overseerr's media status code (1-5)
+MEDIA_STATUSES = (None, "UNKNOWN", "PENDING", "PROCESSING", "PARTIALLY_AVAILABLE", "AVAILABLE")
+
+# Accepted values for the request status filter
+STATUS_FILTERS = ("all", "approved", "available", "pending", "processing", "unavailable", "failed")
+VALID_STATUSES = frozenset(STATUS_FILTERS)
+
+# Fields the tools read from detail lookups; everything else is dropped before caching
+MOVIE_DETAILS_FIELDS = ("title",)
+TV_DETAILS_FIELDS = ("name", "seasons.seasonNumber")
+SEASON_DETAILS_FIELDS = ("episodes.episodeNumber", "episodes.name")
+
+# Tool results are returned as {"columns": [...], "rows": [...]} with one
+# row per request (or per season for TV) instead of one dict per entry
+MOVIE_REQUEST_COLUMNS = ["title", "media_availability", "request_date"]
+TV_REQUEST_COLUMNS = ["tv_title", "tv_title_availability", "tv_season", "tv_season_availability", "tv_episodes", "request_date"]
+TV_EPISODE_COLUMNS = ["episode_number", "episode_name"]
+
+# Zero-padded labels for season and episode numbers
+PADDED_NUMBERS = tuple(f"{number:02d}" for number in range(100))
+
+def media_status_name(code) -> str:
+    """Map an Overseerr media status code to its name."""
+    return MEDIA_STATUSES[code] if isinstance(code, int) and 1 <= code <= 5 else "UNKNOWN"
+
+def parse_start_date(start_date: str | None) -> datetime | None:
+    """Validate and parse the start_date tool argument."""
+    if not start_date:
+        return None
+
+    try:
+        return overseerr.parse_timestamp(start_date)
+    except ValueError:
+        raise ValueError(f"Invalid start_date '{start_date}', expected a date formatted as '2020-09-12T10:00:27.000Z'")
 
 class ToolHandler():
     def __init__(self, tool_name: str):
@@ -37,7 +68,7 @@ class ToolHandler():
     def get_tool_description(self) -> Tool:
         raise NotImplementedError()
 
-    def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+    async def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         raise NotImplementedError()
 
 class StatusToolHandler(ToolHandler):
@@ -55,10 +86,11 @@ class StatusToolHandler(ToolHandler):
             },
         )
 
-    def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
-        # Create synchronous client
-        client = overseerr.Overseerr(api_key=api_key, url=url)
-        data = client.get_status()
+    async def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+        try:
+            data = await client.get_status()
+        except overseerr.OverseerrError as e:
+            data = {"error": str(e)}
 
         if "version" in data:
             status_response = f"\n---\nOverseerr is available and these are the status data:\n"
@@ -74,21 +106,25 @@ class StatusToolHandler(ToolHandler):
             )
         ]
 
-class MovieRequestsToolHandler(ToolHandler):
-    def __init__(self):
-        super().__init__(TOOL_GET_MOVIE_REQUESTS)
+class MediaRequestsToolHandler(ToolHandler):
+    """Base for the tools listing the requests of a single media type."""
+
+    def __init__(self, tool_name: str, media_type: str, description: str):
+        super().__init__(tool_name)
+        self.media_type = media_type
+        self.description = description
 
     def get_tool_description(self):
         return Tool(
             name=self.name,
-            description="Get the list of all movie requests that satisfies the filter arguments.",
+            description=self.description,
             inputSchema={
                 "type": "object",
                 "properties": {
                     "status": {
                         "type": "string",
                         "description": "Filter by media availability status.",
-                        "enum": ["all", "approved", "available", "pending", "processing", "unavailable", "failed"]
+                        "enum": list(STATUS_FILTERS)
                     },
                     "start_date": {
                         "type": "string",
@@ -98,226 +134,144 @@ class MovieRequestsToolHandler(ToolHandler):
             },
         )
 
-    def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+    async def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         # Extract arguments
         status = args.get("status")
         start_date = args.get("start_date")
-        
-        # Now using synchronous approach
-        results = self.get_movie_requests(status, start_date)
-        
+
+        results = await self.get_requests(status, start_date)
+
         return [
             TextContent(
                 type="text",
                 text=json.dumps(results, indent=2)
             )
         ]
-        
-    def get_movie_requests(self, status=None, start_date=None):
-        client = overseerr.Overseerr(api_key=api_key, url=url)
-        
+
+    async def get_requests(self, status=None, start_date=None):
         # Parameter validation
-        valid_statuses = ["all", "approved", "available", "pending", "processing", "unavailable", "failed"]
-        if status and status not in valid_statuses:
+        if status and status not in VALID_STATUSES:
             status = None
-            
-        # Initialize pagination parameters
-        take = 20  # Number of items per page
-        skip = 0   # Starting offset
-        has_more = True
-        
-        all_results = []
-        
-        # Process all pages
-        while has_more:
-            # Prepare params
-            params = {
-                "take": take,
-                "skip": skip
-            }
-            
-            # Add filter if specified
-            if status:
-                params["filter"] = status
-            
-            # Call API
-            response = client.get_requests(params)
-            
-            # Process results
-            results = response.get("results", [])
-            
-            for result in results:
-                # Only process if it's a movie (no tvdbId)
-                media_info = result.get("media", {})
-                if media_info and not media_info.get("tvdbId"):
-                    # Check if request date matches the filter if provided
-                    created_at = result.get("createdAt", "")
-                    if start_date and start_date > created_at:
-                        continue
-                    
-                    # Get movie details to get the title
-                    movie_id = media_info.get("tmdbId")
-                    movie_details = client.get_movie_details(movie_id)
-                    
-                    # Map media availability to string value
-                    media_status_code = media_info.get("status", 1)
-                    media_availability = MEDIA_STATUS_MAPPING.get(media_status_code, "UNKNOWN")
-                    
-                    # Create formatted result
-                    formatted_result = {
-                        "title": movie_details.get("title", "Unknown Movie"),
-                        "media_availability": media_availability,
-                        "request_date": created_at
-                    }
-                    
-                    all_results.append(formatted_result)
-            
-            # Check if there are more pages
-            page_info = response.get("pageInfo", {})
-            if page_info.get("pages", 0) <= (skip // take) + 1:
-                has_more = False
-            else:
-                skip += take
-        
-        return all_results
-
-class TvRequestsToolHandler(ToolHandler):
+
+        # Parse the date filter once rather than comparing strings per request
+        start = parse_start_date(start_date)
+
+        # Prepare params
+        params = {}
+
+        # Add filter if specified
+        if status:
+            params["filter"] = status
+
+        # Keep only requests of this media type within the date filter
+        media_results = []
+        for result in await client.get_all_requests(params, created_after=start):
+            media_info = result.get("media", {})
+            if media_info and media_info.get("mediaType") == self.media_type:
+                # Check if request date matches the filter if provided
+                created_at = result.get("createdAt")
+                if start and (not created_at or overseerr.parse_timestamp(created_at) < start):
+                    continue
+
+                media_results.append(result)
+
+        return await self.format_requests(media_results)
+
+    async def format_requests(self, results: list) -> dict:
+        """Fetch the details needed for the given requests and format them as columns and rows."""
+        raise NotImplementedError()
+
+class MovieRequestsToolHandler(MediaRequestsToolHandler):
     def __init__(self):
-        super().__init__(TOOL_GET_TV_REQUESTS)
+        super().__init__(
+            TOOL_GET_MOVIE_REQUESTS,
+            media_type="movie",
+            description="Get the list of all movie requests that satisfies the filter arguments. Results are returned as column names and rows."
+        )
 
-    def get_tool_description(self):
-        return Tool(
-            name=self.name,
-            description="Get the list of all TV requests that satisfies the filter arguments.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "status": {
-                        "type": "string",
-                        "description": "Filter by media availability status.",
-                        "enum": ["all", "approved", "available", "pending", "processing", "unavailable", "failed"]
-                    },
-                    "start_date": {
-                        "type": "string",
-                        "description": "Filter for the date of request, formatted as '2020-09-12T10:00:27.000Z'"
-                    }
-                }
-            },
+    async def format_requests(self, results: list) -> dict:
+        # Fetch the movie details for every request concurrently
+        movie_details_list = await asyncio.gather(*[
+            client.get_movie_details(result["media"].get("tmdbId"), fields=MOVIE_DETAILS_FIELDS)
+            for result in results
+        ])
+
+        rows = []
+
+        for result, movie_details in zip(results, movie_details_list):
+            media_info = result["media"]
+
+            # Map media availability to string value
+            media_status_code = media_info.get("status", 1)
+            media_availability = media_status_name(media_status_code)
+
+            # Create formatted row, in MOVIE_REQUEST_COLUMNS order
+            rows.append((
+                movie_details.get("title", "Unknown Movie"),
+                media_availability,
+                result.get("createdAt", "")
+            ))
+
+        return {"columns": MOVIE_REQUEST_COLUMNS, "rows": rows}
+
+class TvRequestsToolHandler(MediaRequestsToolHandler):
+    def __init__(self):
+        super().__init__(
+            TOOL_GET_TV_REQUESTS,
+            media_type="tv",
+            description="Get the list of all TV requests that satisfies the filter arguments. Results are returned as column names and rows, one row per season; episodes are [episode_number, episode_name] pairs."
         )
 
-    def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
-        # Extract arguments
-        status = args.get("status")
-        start_date = args.get("start_date")
-        
-        # Now using synchronous approach
-        results = self.get_tv_requests(status, start_date)
-        
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps(results, indent=2)
-            )
+    async def format_requests(self, results: list) -> dict:
+        # Fetch the TV details (title and seasons) for every request concurrently
+        tv_details_list = await asyncio.gather(*[
+            client.get_tv_details(result["media"].get("tmdbId"), fields=TV_DETAILS_FIELDS)
+            for result in results
+        ])
+
+        # Flatten every (show, season) pair, skipping specials (season 0)
+        season_entries = [
+            (result, tv_details, season_number)
+            for result, tv_details in zip(results, tv_details_list)
+            for season in tv_details.get("seasons") or ()
+            for season_number in (season.get("seasonNumber", 0),)
+            if season_number != 0
         ]
-        
-    def get_tv_requests(self, status=None, start_date=None):
-        client = overseerr.Overseerr(api_key=api_key, url=url)
-        
-        # Parameter validation
-        valid_statuses = ["all", "approved", "available", "pending", "processing", "unavailable", "failed"]
-        if status and status not in valid_statuses:
-            status = None
-            
-        # Initialize pagination parameters
-        take = 20  # Number of items per page
-        skip = 0   # Starting offset
-        has_more = True
-        
-        all_results = []
-        
-        # Process all pages
-        while has_more:
-            # Prepare params
-            params = {
-                "take": take,
-                "skip": skip
-            }
-            
-            # Add filter if specified
-            if status:
-                params["filter"] = status
-            
-            # Call API
-            response = client.get_requests(params)
-            
-            # Process results
-            results = response.get("results", [])
-            
-            for result in results:
-                # Only process if it's a TV show (has tvdbId)
-                media_info = result.get("media", {})
-                if media_info and media_info.get("tvdbId"):
-                    # Check if request date matches the filter if provided
-                    created_at = result.get("createdAt", "")
-                    if start_date and start_date > created_at:
-                        continue
-                    
-                    # Get TV details to get the title and seasons
-                    tv_id = media_info.get("tmdbId")
-                    tv_details = client.get_tv_details(tv_id)
-                    
-                    # Map media availability to string value
-                    media_status_code = media_info.get("status", 1)
-                    tv_title_availability = MEDIA_STATUS_MAPPING.get(media_status_code, "UNKNOWN")
-                    
-                    # Get seasons information
-                    seasons = tv_details.get("seasons", [])
-                    
-                    # For each season, get more detailed info including episodes
-                    for season in seasons:
-                        season_number = season.get("seasonNumber", 0)
-                        
-                        # Skip if it's a special season (season 0)
-                        if season_number == 0:
-                            continue
-                        
-                        # Format season string (e.g., S01)
-                        season_str = f"S{season_number:02d}"
-                        
-                        # Get detailed season info including episodes
-                        season_details = client.get_season_details(tv_id, season_number)
-                        
-                        # Season availability is assumed to be the same as the show
-                        tv_season_availability = tv_title_availability
-                        
-                        # Process episodes
-                        episodes = season_details.get("episodes", [])
-                        episode_details = []
-                        
-                        for episode in episodes:
-                            episode_number = episode.get("episodeNumber", 0)
-                            episode_details.append({
-                                "episode_number": f"{episode_number:02d}",
-                                "episode_name": episode.get("name", f"Episode {episode_number}")
-                            })
-                        
-                        # Create formatted result for this season
-                        formatted_result = {
-                            "tv_title": tv_details.get("name", "Unknown TV Show"),
-                            "tv_title_availability": tv_title_availability,
-                            "tv_season": season_str,
-                            "tv_season_availability": tv_season_availability,
-                            "tv_episodes": episode_details,
-                            "request_date": created_at
-                        }
-                        
-                        all_results.append(formatted_result)
-            
-            # Check if there are more pages
-            page_info = response.get("pageInfo", {})
-            if page_info.get("pages", 0) <= (skip // take) + 1:
-                has_more = False
-            else:
-                skip += take
-        
-        return all_results
\ No newline at end of file
+
+        # Get detailed season info including episodes in a single batch
+        season_details_list = await asyncio.gather(*[
+            client.get_season_details(result["media"].get("tmdbId"), season_number, fields=SEASON_DETAILS_FIELDS)
+            for result, _, season_number in season_entries
+        ])
+
+        rows = []
+        append_row = rows.append
+        padded = PADDED_NUMBERS
+
+        for (result, tv_details, season_number), season_details in zip(season_entries, season_details_list):
+            # Map media availability to string value
+            media_status_code = result["media"].get("status", 1)
+            tv_title_availability = media_status_name(media_status_code)
+
+            # Process episodes, as (episode_number, episode_name) pairs
+            episode_details = [
+                (
+                    padded[number] if 0 <= number < 100 else f"{number:02d}",
+                    episode.get("name") or f"Episode {number}"
+                )
+                for episode in season_details.get("episodes") or ()
+                for number in (episode.get("episodeNumber", 0),)
+            ]
+
+            # Create formatted row for this season (e.g., S01), in TV_REQUEST_COLUMNS order.
+            # Season availability is assumed to be the same as the show.
+            append_row((
+                tv_details.get("name", "Unknown TV Show"),
+                tv_title_availability,
+                "S" + (padded[season_number] if 0 <= season_number < 100 else f"{season_number:02d}"),
+                tv_title_availability,
+                episode_details,
+                result.get("createdAt", "")
+            ))
+
+        return {"columns": TV_REQUEST_COLUMNS, "episode_columns": TV_EPISODE_COLUMNS, "rows": rows}
\ No newline at end of file